@@ -22,25 +22,158 @@ Note:
     For production deployment, consider using a production-grade WSGI server.
 """
 
+import atexit
+import hashlib
 import json
 import logging
-import math
 import os
+import tempfile
+import threading
+from collections import OrderedDict, namedtuple
+from operator import itemgetter
 
-from flask import Flask, redirect, render_template, request, url_for
+from flask import Flask, make_response, redirect, render_template, request, url_for
+from markupsafe import Markup
 
 from bgg_helpers import get_games_played_for_user
 
-logging.basicConfig(level=logging.DEBUG)
+try:
+    import orjson
+except ImportError:  # pragma: no cover - stdlib json fallback
+    orjson = None
+
+
+def _log_level(name):
+    """Return the logging level named or numbered by `name`, or None if there is no such level."""
+    if name.isdigit():
+        return int(name)
+    level = logging.getLevelName(name.upper())
+    return level if isinstance(level, int) else None
+
+
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+_level = _log_level(LOG_LEVEL)
+logging.basicConfig(level=logging.INFO if _level is None else _level)
+logger = logging.getLogger(__name__)
+if _level is None:
+    logger.warning(f"Unknown LOG_LEVEL {LOG_LEVEL!r}, logging at INFO")
 
 app = Flask(__name__)
 
 DATA_DIR = "data"
 
+# Number of deferred saves a user may accumulate before they are written to disk.
+# Deferred data lives in one process's memory and is lost on SIGTERM/SIGKILL, so
+# the default of 1 writes every save; raise it only for a single-process server.
+SAVE_BATCH_SIZE = int(os.environ.get("SAVE_BATCH_SIZE", "1"))
+
+# Unflushed user data, keyed by username, as (data, deferred save count). The
+# lock only guards the dict; file writes happen outside it.
+_pending_data = {}
+_pending_lock = threading.Lock()
+
+# Serialize writes to the same user's file without making other users wait
+_write_locks = [threading.Lock() for _ in range(16)]
+
+# Number of parsed user data files kept in memory
+DATA_CACHE_SIZE = 128
+
+# Parsed user data files, keyed by path, as (mtime_ns, size, digest, data); least recently used first
+_data_cache = OrderedDict()
+_data_cache_lock = threading.Lock()
+
+# Part of every page ETag; bump it when templates or page rendering change so
+# browsers stop revalidating pages cached from the old markup
+PAGE_VERSION = "1"
+
+# Number of users whose rendered sorted-list fragment is kept in memory
+SORTED_LIST_CACHE_SIZE = 128
+
+# Last rendered sorted-list fragment per username, as (sorted game ids, html);
+# least recently used first
+_sorted_list_cache = OrderedDict()
+_sorted_list_cache_lock = threading.Lock()
+
 # Create the data directory if it doesn't exist
 os.makedirs(DATA_DIR, exist_ok=True)
 
 
+def _json_loads(raw):
+    """Parse JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _json_dumps(data):
+    """Serialize data to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    # Match orjson's compact UTF-8 output
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _copy_user_data(user_data):
+    """Copy user data deeply enough for routes to reorder its game lists.
+
+    Routes move game records between lists but never modify a record itself, so
+    the records are shared and only the lists are copied.
+    """
+    return {key: list(value) if isinstance(value, list) else value for key, value in user_data.items()}
+
+
+def _write_lock(username):
+    """Return the lock that serializes writes to a user's data file."""
+    return _write_locks[hash(username) % len(_write_locks)]
+
+
+def _digest(raw):
+    """Return a short hex digest of a user data file's bytes."""
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+
+def _lru_put(cache, key, value, max_size):
+    """Store `value` as the most recently used entry of `cache`, evicting the least recent past `max_size`.
+
+    The caller must hold the cache's lock.
+    """
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > max_size:
+        cache.popitem(last=False)
+
+
+def _cache_data(file_path, stat, digest, user_data):
+    """Remember parsed user data and its content digest for a file at the given stat result."""
+    with _data_cache_lock:
+        _lru_put(_data_cache, file_path, (stat.st_mtime_ns, stat.st_size, digest, user_data), DATA_CACHE_SIZE)
+
+
+def _read_data(file_path):
+    """Read and parse a user data file, reusing the cached parse while it is unchanged.
+
+    Returns the file's content digest and its parsed data. Callers must not
+    mutate the returned data; `load_data` hands out copies.
+    Files written before a list existed (e.g. 'skipped') get it filled in here, once
+    per parse, so routes can index every list directly.
+    """
+    stat = os.stat(file_path)
+    with _data_cache_lock:
+        cached = _data_cache.get(file_path)
+        if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+            _data_cache.move_to_end(file_path)
+            return cached[2:]
+
+    with open(file_path, "rb") as file:
+        raw = file.read()
+    user_data = _json_loads(raw)
+    for key in ("skipped", "sorted", "unsorted"):
+        user_data.setdefault(key, [])
+    digest = _digest(raw)
+    _cache_data(file_path, stat, digest, user_data)
+    return digest, user_data
+
+
 def load_data(username):
     """
     Load user data from a JSON file.
@@ -62,21 +195,33 @@ def load_data(username):
           by the DATA_DIR constant.
         - If the file doesn't exist, no error is raised. Instead, a default
           structure is returned.
+        - Parsed files are cached in-process keyed on their mtime and size, so
+          repeated loads of an unchanged file skip both the read and the JSON parse.
+        - Game records are shared with the cache; only the lists holding them are
+          copied, so callers may reorder the lists but must not modify a record.
+        - Data saved with `flush=False` that has not reached disk yet is
+          returned in preference to the file contents.
 
     Example:
         >>> user_data = load_data('johndoe')
         >>> print(user_data)
         {"skipped": [], "sorted": [], "unsorted": []}
     """
+    if SAVE_BATCH_SIZE > 1:
+        with _pending_lock:
+            pending = _pending_data.get(username)
+            if pending is not None:
+                return _copy_user_data(pending[0])
+
     file_path = os.path.join(DATA_DIR, f"{username}.json")
-    if os.path.exists(file_path):
-        with open(file_path, "r") as file:
-            return json.load(file)
-    user_data = {"skipped": [], "sorted": [], "unsorted": []}
-    return user_data
+    try:
+        return _copy_user_data(_read_data(file_path)[1])
+    except FileNotFoundError:
+        user_data = {"skipped": [], "sorted": [], "unsorted": []}
+        return user_data
 
 
-def save_data(username, data):
+def save_data(username, data, *, flush=True):
     """Save user data to a JSON file.
 
     This function takes a username and corresponding data, then saves it to a JSON
@@ -87,6 +232,10 @@ def save_data(username, data):
         username (str): The username of the user whose data is being saved.
         data (dict): The data to be saved, typically containing 'unsorted' and
             'sorted' lists.
+        flush (bool): Write the file immediately. When False and SAVE_BATCH_SIZE
+            is above 1, the data is kept in memory and only written once
+            SAVE_BATCH_SIZE deferred saves have accumulated for the user, or when
+            `flush_pending_data` runs.
 
     Returns:
         None
@@ -95,10 +244,65 @@ def save_data(username, data):
         IOError: If there's an issue writing to the file.
         TypeError: If the data is not JSON serializable.
     """
-
+    with _write_lock(username):
+        if SAVE_BATCH_SIZE <= 1:
+            _write_data(username, data)
+            return
+
+        with _pending_lock:
+            if not flush:
+                _, deferred = _pending_data.get(username, (None, 0))
+                if deferred + 1 < SAVE_BATCH_SIZE:
+                    _pending_data[username] = (data, deferred + 1)
+                    return
+        _write_data(username, data)
+        # Dropped only after the write so loads never fall back to the old file
+        with _pending_lock:
+            _pending_data.pop(username, None)
+
+
+def _write_data(username, data):
+    """Write user data to its JSON file and invalidate the load cache.
+
+    The data is written to a temporary file that then replaces the real one, so
+    a crash mid-write never leaves a truncated user file behind. The temporary
+    file is removed if the write or the replace fails.
+    """
     file_path = os.path.join(DATA_DIR, f"{username}.json")
-    with open(file_path, "w") as file:
-        json.dump(data, file)
+    raw = _json_dumps(data)
+    # A unique name per write, so concurrent writers never share a temp file
+    fd, tmp_path = tempfile.mkstemp(dir=DATA_DIR, prefix=f"{username}.json.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(raw)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    # Refresh the cache from what we just wrote so the next load skips the parse
+    _cache_data(file_path, os.stat(file_path), _digest(raw), _copy_user_data(data))
+
+
+def flush_pending_data():
+    """Write all deferred user data to disk.
+
+    Returns:
+        None
+    """
+    with _pending_lock:
+        usernames = list(_pending_data)
+    for username in usernames:
+        with _write_lock(username):
+            with _pending_lock:
+                pending = _pending_data.get(username)
+            if pending is None:
+                continue
+            _write_data(username, pending[0])
+            with _pending_lock:
+                _pending_data.pop(username, None)
+
+
+atexit.register(flush_pending_data)
 
 
 def delete_data(username):
@@ -116,9 +320,17 @@ def delete_data(username):
     Raises:
         IOError: If there's an issue deleting the file.
     """
+    with _sorted_list_cache_lock:
+        _sorted_list_cache.pop(username, None)
+
     file_path = os.path.join(DATA_DIR, f"{username}.json")
-    if os.path.exists(file_path):
-        os.remove(file_path)
+    with _write_lock(username):
+        with _pending_lock:
+            _pending_data.pop(username, None)
+        try:
+            os.remove(file_path)
+        except FileNotFoundError:
+            pass
 
 
 def max_comparisons(n):
@@ -137,7 +349,112 @@ def max_comparisons(n):
     Raises:
         ValueError: If `n` is negative, as a list cannot have a negative length.
     """
-    return math.ceil(math.log2(n + 1))
+    if n < 0:
+        raise ValueError("n must be non-negative")
+    # ceil(log2(n + 1)) is the number of bits needed to represent n
+    return n.bit_length()
+
+
+def render_sorted_list(username, sorted_games):
+    """Render the sorted games list shown alongside each comparison.
+
+    The list only changes when a game is inserted, while the page around it is
+    re-rendered on every comparison click, so the last fragment rendered for
+    each user is reused until the sorted game ids change. Checking the ids is
+    still one pass over the list, but it skips rendering the template.
+
+    Args:
+        username (str): The username of the user whose games are being sorted.
+        sorted_games (list): The user's sorted games.
+
+    Returns:
+        markupsafe.Markup: The rendered 'sorted_list.html' fragment.
+    """
+    key = tuple(game["id"] for game in sorted_games)
+    with _sorted_list_cache_lock:
+        cached = _sorted_list_cache.get(username)
+        if cached is not None and cached[0] == key:
+            _sorted_list_cache.move_to_end(username)
+            return cached[1]
+
+    html = Markup(render_template("sorted_list.html", sorted_games=sorted_games))
+    with _sorted_list_cache_lock:
+        _lru_put(_sorted_list_cache, username, (key, html), SORTED_LIST_CACHE_SIZE)
+    return html
+
+
+def data_etag(username, *variants):
+    """Build an ETag for a page rendered purely from a user's saved data.
+
+    The tag combines PAGE_VERSION with a digest of the user's data file. Saves
+    made by this process refresh the digest from the bytes they wrote, so they
+    always change the tag. A rewrite by another process is only noticed once it
+    changes the file's mtime or size, the same as for `load_data`. Deferred
+    saves are flushed before non-sort routes run, so the file is current here.
+
+    Args:
+        username (str): The username of the user whose data the page shows.
+        *variants: Request parameters that also change the rendered page.
+
+    Returns:
+        str: The ETag value, without quotes.
+    """
+    file_path = os.path.join(DATA_DIR, f"{username}.json")
+    try:
+        digest = _read_data(file_path)[0]
+    except FileNotFoundError:
+        digest = "0"
+    return "-".join([PAGE_VERSION, digest, *map(str, variants)])
+
+
+def tagged_response(body, etag, status=200):
+    """Wrap a page body in a response carrying `etag` that must be revalidated.
+
+    Args:
+        body (str): The response body.
+        etag (str): The ETag of the page content.
+        status (int): The HTTP status code.
+
+    Returns:
+        werkzeug.wrappers.Response: The tagged response.
+    """
+    response = make_response(body, status)
+    response.set_etag(etag, weak=True)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+SortParams = namedtuple("SortParams", ["low", "high", "comparison_count"])
+
+
+def parse_sort_params(form, sorted_count):
+    """Parse the binary-search state posted by the comparison form.
+
+    Args:
+        form (werkzeug.datastructures.MultiDict): The submitted form data.
+        sorted_count (int): The number of games already in the sorted list.
+
+    Returns:
+        SortParams: The search bounds and the number of the comparison about to
+        be made. Missing fields default to a search over the whole sorted list.
+
+    Raises:
+        ValueError: If a field is not an integer or the bounds fall outside the
+            sorted list.
+    """
+    low = int(form.get("low", 0))
+    high = int(form.get("high", sorted_count - 1))
+    comparison_count = int(form.get("current_comparison_count", 0)) + 1
+    if not (0 <= low <= sorted_count and -1 <= high < sorted_count):
+        raise ValueError(f"Search bounds {low}..{high} outside sorted list of {sorted_count}")
+    return SortParams(low, high, comparison_count)
+
+
+@app.before_request
+def flush_outside_sort():
+    """Persist deferred sort-session saves before any other route runs."""
+    if SAVE_BATCH_SIZE > 1 and request.endpoint not in ("sort_games", "static"):
+        flush_pending_data()
 
 
 @app.route("/", methods=["GET", "POST"])
@@ -250,9 +567,8 @@ def load():
         # Fetch and store data if not already stored
         games = get_games_played_for_user(username, order=order)
         if games:
-            user_data["unsorted"] = [
-                {"id": game["id"], "name": game["name"], "image": game["image"], "url": game["url"]} for game in games
-            ]
+            # Games already carry exactly the keys we store
+            user_data["unsorted"] = games
             save_data(username, user_data)
 
         return redirect(url_for("games", username=username))
@@ -273,7 +589,8 @@ def games():
     Returns:
         Union[str, Tuple[str, int]]: If a valid username is provided, returns a
         rendered 'games.html' template with all games. If no username is provided,
-        returns an error message with a 400 status code.
+        returns an error message with a 400 status code. If the client's
+        If-None-Match already matches the user's data, returns an empty 304.
 
     Raises:
         None
@@ -288,10 +605,16 @@ def games():
     if not username:
         return "Username required", 400
 
+    etag = data_etag(username)
+    if request.if_none_match.contains_weak(etag):
+        return tagged_response("", etag, 304)
+
     user_data = load_data(username)
     all_games = user_data["unsorted"] + user_data["sorted"]
-    all_games.sort(key=lambda game: game["name"])  # Assuming games have a "name" key
-    return render_template("games.html", stylesheet="gamelist.css", username=username, games=all_games)
+    all_games.sort(key=itemgetter("name"))
+    return tagged_response(
+        render_template("games.html", stylesheet="gamelist.css", username=username, games=all_games), etag
+    )
 
 
 @app.route("/top_games")
@@ -308,7 +631,8 @@ def top_games():
     Returns:
         Union[str, Tuple[str, int]]: If a valid username is provided, returns a
         rendered 'top_games.html' template with the top games. If no username is
-        provided, returns an error message with a 400 status code.
+        provided, returns an error message with a 400 status code. If the client's
+        If-None-Match already matches the user's data, returns an empty 304.
 
     Raises:
         None
@@ -325,21 +649,28 @@ def top_games():
     if not username:
         return "Username required", 400
 
+    max = request.args.get("max", None)
+    etag = data_etag(username, max)
+    if request.if_none_match.contains_weak(etag):
+        return tagged_response("", etag, 304)
+
     user_data = load_data(username)
 
-    max = request.args.get("max", None)
     if max is None:
         title = f"Top Games for {username}"
     else:
         max = int(max)
         title = f"Top {max} Games for {username}"
-    return render_template(
-        "top_games.html",
-        stylesheet="gamelist.css",
-        username=username,
-        title=title,
-        max=max,
-        games=user_data["sorted"][:max],
+    return tagged_response(
+        render_template(
+            "top_games.html",
+            stylesheet="gamelist.css",
+            username=username,
+            title=title,
+            max=max,
+            games=user_data["sorted"][:max],
+        ),
+        etag,
     )
 
 
@@ -362,6 +693,7 @@ def sort_games():
                 - During sorting: Returns a rendered 'sort_games.html' template.
                 - After inserting a game: Returns a redirect to the sort_games route.
             - If no username is provided: Returns an error message with a 400 status code.
+            - If the posted search state is invalid: Returns an error message with a 400 status code.
 
     Raises:
         None
@@ -384,7 +716,7 @@ def sort_games():
     user_data = load_data(username)
     unsorted_games = user_data["unsorted"]
     sorted_games = user_data["sorted"]
-    skipped_games = user_data.get("skipped")
+    skipped_games = user_data["skipped"]
 
     if not unsorted_games:
         return "All games have been sorted!"
@@ -392,15 +724,14 @@ def sort_games():
     # Check if we're adding the first game
     if not sorted_games and "add_first" in request.args:
         sorted_games.append(unsorted_games.pop(0))
-        save_data(username, user_data)
+        save_data(username, user_data, flush=False)
         return redirect(url_for("sort_games", username=username))
 
     # Check if we're skipping a game
     if "skip" in request.args:
         skipped_game = unsorted_games.pop(0)
         skipped_games.append(skipped_game)
-        user_data["skipped"] = skipped_games
-        save_data(username, user_data)
+        save_data(username, user_data, flush=False)
         return redirect(url_for("sort_games", username=username))
 
     # If sorted_games is empty, prompt to add or skip the first game
@@ -408,9 +739,10 @@ def sort_games():
         return render_template("sort_first_game.html", username=username, first_game=unsorted_games[0])
 
     game = unsorted_games[0]
-    low = int(request.form.get("low", 0))
-    high = int(request.form.get("high", len(sorted_games) - 1))
-    current_comparison_count = int(request.form.get("current_comparison_count", 0)) + 1
+    try:
+        low, high, current_comparison_count = parse_sort_params(request.form, len(sorted_games))
+    except ValueError:
+        return "Invalid sort parameters", 400
 
     if low <= high:
         mid = (low + high) // 2
@@ -424,7 +756,7 @@ def sort_games():
             high=high,
             current_comparison_count=current_comparison_count,
             max_comparisons=max_comparisons(len(sorted_games)),
-            sorted_games=sorted_games,
+            sorted_list=render_sorted_list(username, sorted_games),
         )
     else:
         sorted_games.insert(low, game)
@@ -445,16 +777,11 @@ def unskip_selected_games(username, selected_games):
     """
     user_data = load_data(username)
     skipped_games = user_data["skipped"]
-    unsorted_games = user_data["unsorted"]
+    selected = set(selected_games)
 
-    for game_id in selected_games:
-        # print(f"Unskipping game with ID: {game_id}")
-        for game in skipped_games:
-            if game["id"] == game_id:
-                # print(f"Unskipping game: {game['name']}")
-                unsorted_games.append(game)
-                skipped_games.remove(game)
-                break
+    # Partition in a single pass; skipped games keep their relative order
+    user_data["unsorted"].extend(game for game in skipped_games if game["id"] in selected)
+    user_data["skipped"] = [game for game in skipped_games if game["id"] not in selected]
 
     save_data(username, user_data)
 
@@ -471,7 +798,7 @@ def unskip():
     if not selected_games:
         user_data = load_data(username)
         skipped_games = user_data["skipped"]
-        skipped_games.sort(key=lambda game: game["name"])
+        skipped_games.sort(key=itemgetter("name"))
         return render_template("unskip.html", stylesheet="gamelist.css", username=username, games=skipped_games)
 
     # print(f"Going to unskip these game ids: {selected_games}")
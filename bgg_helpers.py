@@ -11,21 +11,58 @@ Note:
     for production use and should be addressed in a secure environment.
 """
 
+import io
 import logging
 import random
+from datetime import timedelta
+from operator import itemgetter
+from xml.etree.ElementTree import ParseError
 
 import requests
 import requests_cache
-from defusedxml.ElementTree import fromstring as defused_fromstring
+from defusedxml import DefusedXmlException
+from defusedxml.ElementTree import iterparse as defused_iterparse
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Create a global session for requests with SSL verification disabled
-session = requests_cache.CachedSession("bgg_cache", use_cache_dir=True)
+# How long a fetched collection is reused before BGG is asked again
+CACHE_EXPIRE_AFTER = timedelta(days=1)
+
+# Create a global session for requests with SSL verification disabled. The SQLite
+# cache runs in WAL mode so concurrent Flask threads can read it during a write.
+# Only successful responses are cached, and an expired one is still served if BGG
+# is unreachable.
+session = requests_cache.CachedSession(
+    "bgg_cache",
+    use_cache_dir=True,
+    wal=True,
+    expire_after=CACHE_EXPIRE_AFTER,
+    allowable_codes=(200,),
+    stale_if_error=True,
+)
 session.verify = False  # Disable SSL verification
 requests.packages.urllib3.disable_warnings(requests.packages.urllib3.exceptions.InsecureRequestWarning)
 
+# Keep connections to BGG alive across requests and retry transient server errors.
+# A 429 is not retried: hammering a throttling API only prolongs the throttle, and
+# stale_if_error serves the cached collection instead. Retry-After on a 5xx is
+# ignored so a failing fetch can't hold a request thread for as long as BGG asks.
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[500, 502, 503, 504],
+        respect_retry_after_header=False,
+    ),
+)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
 
 def get_games_played_for_user(username, order="default"):
     """
@@ -68,7 +105,7 @@ def get_games_played_for_user(username, order="default"):
             random.shuffle(games)
             logger.debug(f"Games shuffled randomly for user {username}")
         elif order == "sorted":
-            games.sort(key=lambda game: game["name"])  # Assuming games have a "name" key
+            games.sort(key=itemgetter("name"))
             logger.debug(f"Games sorted alphabetically for user {username}")
 
         return games
@@ -90,30 +127,66 @@ def parse_bgg_xml(xml_data):
 
     Returns:
         list: A list of dictionaries, each containing information about a game.
-              Each dictionary includes 'id', 'name', and 'image' keys.
+              Each dictionary has exactly the 'id', 'name', 'image', 'thumbnail', and
+              'url' keys, which is the record format stored in user data files.
 
     Raises:
         Exception: If there's an error parsing the XML data.
 
     Note:
         This function uses defusedxml for secure XML parsing to prevent XML vulnerabilities.
+        The document is parsed incrementally and each <item> is discarded once read,
+        so large collections never exist as a complete element tree. An <item>
+        without a name or a numeric objectid is skipped; only a malformed
+        document discards the whole collection.
     """
 
     games_dict = {}
     try:
-        root = defused_fromstring(xml_data)
-        for item in root.findall("item"):
-            game_id = int(item.get("objectid"))
-            name = item.find("name").text
-            image = item.find("image").text if item.find("image") is not None else ""
+        root = None
+        depth = 0
+        for event, item in defused_iterparse(io.BytesIO(xml_data), events=("start", "end")):
+            if event == "start":
+                if root is None:
+                    root = item
+                depth += 1
+                continue
+            depth -= 1
+            # Only the root's direct <item> children are games
+            if depth != 1 or item.tag != "item":
+                continue
+
+            # Detach the finished item so the tree never holds more than one game
+            root.clear()
+
+            # Collect the child elements' text in one pass instead of a find() per field
+            fields = {"image": "", "thumbnail": ""}
+            for child in item:
+                fields[child.tag] = child.text
+            name = fields.get("name")
+            try:
+                game_id = int(item.attrib["objectid"])
+            except (KeyError, ValueError):
+                game_id = None
+            if name is None or game_id is None:
+                logger.warning(f"Skipping incomplete collection item: {item.attrib}")
+                continue
             url = boardgame_url(game_id)
 
             # Use the game_id as the key in the dictionary
-            games_dict[game_id] = {"id": game_id, "name": name, "image": image, "url": url}
+            games_dict[game_id] = {
+                "id": game_id,
+                "name": name,
+                "image": fields["image"],
+                "thumbnail": fields["thumbnail"],
+                "url": url,
+            }
 
         logger.debug(f"Successfully parsed {len(games_dict)} unique games from XML")
-    except Exception as e:
+    except (ParseError, DefusedXmlException) as e:
         logger.error(f"Error parsing XML data: {e}")
+        # Don't return a partial collection from a truncated or malformed document
+        games_dict = {}
 
     # Convert the dictionary values to a list
     return list(games_dict.values())
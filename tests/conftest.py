@@ -0,0 +1,9 @@
+from unittest.mock import patch
+
+import pytest
+
+
+@pytest.fixture
+def mock_session_get():
+    with patch("bgg_helpers.session.get") as mock_get:
+        yield mock_get
@@ -0,0 +1,254 @@
+import logging
+import os
+import threading
+
+import pytest
+
+import app
+from app import (
+    flush_pending_data,
+    load_data,
+    max_comparisons,
+    parse_sort_params,
+    render_sorted_list,
+    save_data,
+    unskip_selected_games,
+)
+
+
+@pytest.fixture(scope="session")
+def session_data_dir(tmp_path_factory):
+    return tmp_path_factory.mktemp("data")
+
+
+@pytest.fixture
+def temp_data_dir(session_data_dir, monkeypatch):
+    monkeypatch.setattr(app, "DATA_DIR", str(session_data_dir))
+    yield session_data_dir
+    app._pending_data.clear()
+    app._sorted_list_cache.clear()
+    app._data_cache.clear()
+    for path in session_data_dir.iterdir():
+        path.unlink()
+
+
+def test_load_data_missing_user(temp_data_dir):
+    assert load_data("nobody") == {"skipped": [], "sorted": [], "unsorted": []}
+
+
+def test_save_and_load_data(temp_data_dir):
+    data = {"skipped": [], "sorted": [{"id": 1, "name": "Game 1"}], "unsorted": []}
+    save_data("test_user", data)
+
+    assert load_data("test_user") == data
+
+
+def test_load_data_returns_independent_copies(temp_data_dir):
+    save_data("test_user", {"skipped": [], "sorted": [], "unsorted": [{"id": 1, "name": "Game 1"}]})
+
+    first = load_data("test_user")
+    first["unsorted"].pop()
+
+    assert load_data("test_user")["unsorted"] == [{"id": 1, "name": "Game 1"}]
+
+
+def test_load_data_sees_new_saves(temp_data_dir):
+    save_data("test_user", {"skipped": [], "sorted": [], "unsorted": []})
+    load_data("test_user")
+    save_data("test_user", {"skipped": [], "sorted": [{"id": 2, "name": "Game 2"}], "unsorted": []})
+
+    assert load_data("test_user")["sorted"] == [{"id": 2, "name": "Game 2"}]
+
+
+def test_deferred_save_writes_immediately_by_default(temp_data_dir):
+    save_data("test_user", {"skipped": [], "sorted": [], "unsorted": []}, flush=False)
+
+    assert (temp_data_dir / "test_user.json").exists()
+
+
+def test_unbatched_saves_skip_pending_lock(temp_data_dir):
+    data = {"skipped": [], "sorted": [{"id": 1, "name": "Game 1"}], "unsorted": []}
+    loaded = []
+    worker = threading.Thread(target=lambda: (save_data("test_user", data), loaded.append(load_data("test_user"))))
+
+    with app._pending_lock:
+        worker.start()
+        worker.join(timeout=5)
+        assert not worker.is_alive()
+
+    assert loaded == [data]
+
+
+def test_deferred_save_is_visible_before_flush(temp_data_dir, monkeypatch):
+    monkeypatch.setattr(app, "SAVE_BATCH_SIZE", 10)
+    data = {"skipped": [{"id": 1, "name": "Game 1"}], "sorted": [], "unsorted": []}
+    save_data("test_user", data, flush=False)
+
+    assert not (temp_data_dir / "test_user.json").exists()
+    assert load_data("test_user") == data
+
+    flush_pending_data()
+
+    assert (temp_data_dir / "test_user.json").exists()
+    assert load_data("test_user") == data
+
+
+def test_deferred_saves_flush_at_batch_size(temp_data_dir, monkeypatch):
+    monkeypatch.setattr(app, "SAVE_BATCH_SIZE", 10)
+    data = {"skipped": [], "sorted": [], "unsorted": []}
+    for _ in range(app.SAVE_BATCH_SIZE):
+        save_data("test_user", data, flush=False)
+
+    assert (temp_data_dir / "test_user.json").exists()
+
+
+def test_unskip_selected_games(temp_data_dir):
+    games = [{"id": game_id, "name": f"Game {game_id}"} for game_id in (1, 2, 3)]
+    save_data("test_user", {"skipped": games, "sorted": [], "unsorted": []})
+
+    unskip_selected_games("test_user", [3, 1])
+
+    user_data = load_data("test_user")
+    assert user_data["skipped"] == [games[1]]
+    assert user_data["unsorted"] == [games[0], games[2]]
+
+
+@pytest.mark.parametrize(
+    "name,expected",
+    [("debug", logging.DEBUG), ("WARNING", logging.WARNING), ("10", logging.DEBUG), ("VERBOSE", None), ("", None)],
+)
+def test_log_level(name, expected):
+    assert app._log_level(name) == expected
+
+
+@pytest.mark.parametrize("n,expected", [(0, 0), (1, 1), (2, 2), (3, 2), (4, 3), (7, 3), (8, 4), (15, 4), (16, 5)])
+def test_max_comparisons(n, expected):
+    assert max_comparisons(n) == expected
+
+
+def test_max_comparisons_negative():
+    with pytest.raises(ValueError):
+        max_comparisons(-1)
+
+
+def test_render_sorted_list_reuses_fragment(temp_data_dir):
+    sorted_games = [{"id": 1, "name": "Game 1"}, {"id": 2, "name": "Game 2"}]
+    with app.app.test_request_context():
+        first = render_sorted_list("test_user", sorted_games)
+        assert render_sorted_list("test_user", list(sorted_games)) is first
+
+        sorted_games.insert(1, {"id": 3, "name": "Game 3"})
+        updated = render_sorted_list("test_user", sorted_games)
+
+    assert "1 - Game 3" in updated
+    assert "2 - Game 2" in updated
+
+
+def test_render_sorted_list_evicts_least_recent_user(temp_data_dir, monkeypatch):
+    monkeypatch.setattr(app, "SORTED_LIST_CACHE_SIZE", 2)
+    with app.app.test_request_context():
+        for username in ("a", "b", "a", "c"):
+            render_sorted_list(username, [])
+
+    assert list(app._sorted_list_cache) == ["a", "c"]
+
+
+def test_delete_data_drops_rendered_sorted_list(temp_data_dir):
+    with app.app.test_request_context():
+        render_sorted_list("test_user", [{"id": 1, "name": "Game 1"}])
+
+    app.delete_data("test_user")
+
+    assert "test_user" not in app._sorted_list_cache
+
+
+def test_save_data_leaves_no_temp_file(temp_data_dir):
+    save_data("test_user", {"skipped": [], "sorted": [], "unsorted": []})
+
+    assert sorted(path.name for path in temp_data_dir.iterdir()) == ["test_user.json"]
+
+
+def test_failed_save_removes_temp_file(temp_data_dir, monkeypatch):
+    def fail_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(app.os, "replace", fail_replace)
+
+    with pytest.raises(OSError):
+        save_data("test_user", {"skipped": [], "sorted": [], "unsorted": []})
+
+    assert list(temp_data_dir.iterdir()) == []
+
+
+def test_json_fallback_matches_orjson(temp_data_dir, monkeypatch):
+    pytest.importorskip("orjson")
+    data = {"skipped": [], "sorted": [{"id": 1, "name": "Café Ünd Spiele", "image": ""}], "unsorted": []}
+    expected = app._json_dumps(data)
+    monkeypatch.setattr(app, "orjson", None)
+
+    save_data("test_user", data)
+    app._data_cache.clear()
+
+    assert (temp_data_dir / "test_user.json").read_bytes() == expected
+    assert load_data("test_user") == data
+
+
+def test_load_data_fills_missing_lists(temp_data_dir):
+    (temp_data_dir / "test_user.json").write_text('{"sorted": [], "unsorted": []}')
+
+    assert load_data("test_user") == {"skipped": [], "sorted": [], "unsorted": []}
+
+
+def test_load_data_sees_external_changes(temp_data_dir):
+    save_data("test_user", {"skipped": [], "sorted": [], "unsorted": []})
+    load_data("test_user")
+    (temp_data_dir / "test_user.json").write_text('{"skipped": [], "sorted": [{"id": 1}], "unsorted": []}')
+
+    assert load_data("test_user")["sorted"] == [{"id": 1}]
+
+
+def test_parse_sort_params_defaults():
+    assert parse_sort_params({}, 4) == (0, 3, 1)
+
+
+@pytest.mark.parametrize("form", [{"low": "x"}, {"low": "-1"}, {"high": "4"}, {"current_comparison_count": ""}])
+def test_parse_sort_params_rejects_invalid(form):
+    with pytest.raises(ValueError):
+        parse_sort_params(form, 4)
+
+
+@pytest.mark.parametrize("form", [{"low": "x"}, {"low": "5"}, {"high": "9"}])
+def test_sort_rejects_invalid_search_bounds(temp_data_dir, form):
+    games = [{"id": game_id, "name": f"Game {game_id}", "image": ""} for game_id in (1, 2, 3)]
+    save_data("test_user", {"skipped": [], "sorted": games[:2], "unsorted": games[2:]})
+
+    response = app.app.test_client().post("/sort?username=test_user", data=form)
+
+    assert response.status_code == 400
+
+
+def test_games_revalidates_with_etag(temp_data_dir):
+    save_data("test_user", {"skipped": [], "sorted": [], "unsorted": [{"id": 1, "name": "Game 1", "image": ""}]})
+    client = app.app.test_client()
+
+    response = client.get("/games?username=test_user")
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+
+    assert client.get("/games?username=test_user", headers={"If-None-Match": etag}).status_code == 304
+
+    save_data("test_user", {"skipped": [], "sorted": [], "unsorted": []})
+    assert client.get("/games?username=test_user", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_data_etag_changes_on_local_save_keeping_size_and_mtime(temp_data_dir):
+    path = temp_data_dir / "test_user.json"
+    save_data("test_user", {"skipped": [], "sorted": [{"id": 1}], "unsorted": []})
+    stat = path.stat()
+    etag = app.data_etag("test_user")
+
+    save_data("test_user", {"skipped": [], "sorted": [{"id": 2}], "unsorted": []})
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert path.stat().st_size == stat.st_size
+    assert app.data_etag("test_user") != etag
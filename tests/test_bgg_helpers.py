@@ -1,37 +1,61 @@
-from unittest.mock import patch
-
 from bgg_helpers import get_games_played_for_user, parse_bgg_xml
 from tests.test_data import MOCK_PLAYED_GAMES_XML
 
 
-@patch("bgg_helpers.session.get")
-def test_get_games_played_for_user(mock_get):
-    # Mock the response object
-    class MockResponse:
-        def __init__(self, content, status_code):
-            self.content = content
-            self.status_code = status_code
+class MockResponse:
+    def __init__(self, content, status_code):
+        self.content = content
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        pass
 
-        def raise_for_status(self):
-            pass
 
+def test_get_games_played_for_user(mock_session_get):
     # Mock the response with the shared mock data
-    mock_get.return_value = MockResponse(MOCK_PLAYED_GAMES_XML, 200)
+    mock_session_get.return_value = MockResponse(MOCK_PLAYED_GAMES_XML, 200)
 
     # Call the function
     games = get_games_played_for_user("test_user")
 
     # Assert the results
     assert len(games) == 2
-    assert games[0]["id"] == "1"
+    assert games[0]["id"] == 1
     assert games[1]["name"] == "Game 2"
 
 
+def test_get_games_played_for_user_sorted_order(mock_session_get):
+    mock_session_get.return_value = MockResponse(MOCK_PLAYED_GAMES_XML.replace(b"Game 1", b"Game 3"), 200)
+
+    games = get_games_played_for_user("test_user", order="sorted")
+
+    assert [game["name"] for game in games] == ["Game 2", "Game 3"]
+
+
 def test_parse_bgg_xml():
     # Use the shared mock data
     games = parse_bgg_xml(MOCK_PLAYED_GAMES_XML)
 
     # Assert the results
     assert len(games) == 2
-    assert games[0]["id"] == "1"
+    assert games[0]["id"] == 1
     assert games[1]["image"] == "http://example.com/image2.jpg"
+
+
+def test_parse_bgg_xml_thumbnail():
+    games = parse_bgg_xml(MOCK_PLAYED_GAMES_XML)
+
+    assert games[0]["thumbnail"] == "http://example.com/thumbnail1.jpg"
+    assert games[1]["thumbnail"] == ""
+
+
+def test_parse_bgg_xml_malformed():
+    assert parse_bgg_xml(MOCK_PLAYED_GAMES_XML[:-20]) == []
+
+
+def test_parse_bgg_xml_skips_incomplete_items():
+    xml_data = MOCK_PLAYED_GAMES_XML.replace(
+        b"</items>", b'<item objectid="3"><image>http://example.com/image3.jpg</image></item></items>'
+    )
+
+    assert [game["id"] for game in parse_bgg_xml(xml_data)] == [1, 2]
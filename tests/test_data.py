@@ -3,6 +3,7 @@ MOCK_PLAYED_GAMES_XML = b"""
     <item objectid="1">
         <name>Game 1</name>
         <image>http://example.com/image1.jpg</image>
+        <thumbnail>http://example.com/thumbnail1.jpg</thumbnail>
     </item>
     <item objectid="2">
         <name>Game 2</name>